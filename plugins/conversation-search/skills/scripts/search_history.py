@@ -5,6 +5,10 @@ Search past Claude Code conversations for previously solved problems.
 Usage:
     search_history.py <query> [--project <path>] [--limit <n>] [--format json|text]
     search_history.py --digest [today|yesterday|YYYY-MM-DD] [--project <path>]
+    search_history.py --facets project,branch,tool,command,file [<value filter>] [--days N]
+
+Every mode accepts one or more --root <dir> history roots (default: the
+"roots" list in ~/.claude/conversation-search.json, else ~/.claude/projects).
 
 Examples:
     search_history.py "EMFILE error"
@@ -13,16 +17,28 @@ Examples:
     search_history.py --today "newsletter"
     search_history.py --days 3 "fix bug"
     search_history.py --digest today --project ~/Projects/nuxt/secondBrain
+    search_history.py --facets project,tool,command --days 30
+    search_history.py "EMFILE error" --root ~/.claude --root /mnt/shared/devbox-2
 """
 
 import argparse
+import hashlib
+import heapq
 import json
+import math
+import os
+import pickle
 import re
+import shlex
 import sys
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 
 @dataclass
@@ -65,6 +81,75 @@ def get_claude_projects_dir() -> Path:
     return Path.home() / '.claude' / 'projects'
 
 
+def get_config_path() -> Path:
+    """Get the conversation-search config file path."""
+    return Path.home() / '.claude' / 'conversation-search.json'
+
+
+def load_config_roots() -> list:
+    """Read the list of history roots from the config file, if any."""
+    config_path = get_config_path()
+    if not config_path.exists():
+        return []
+
+    try:
+        config = json.loads(config_path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Invalid config {config_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    roots = config.get('roots', []) if isinstance(config, dict) else []
+    if not isinstance(roots, list) or not all(isinstance(root, str) for root in roots):
+        print(f"Invalid config {config_path}: 'roots' must be a list of paths", file=sys.stderr)
+        sys.exit(1)
+    return roots
+
+
+def is_projects_dir(path: Path) -> bool:
+    """Check whether a directory is a projects directory given directly."""
+    if path.name == 'projects' and path.parent.name == '.claude':
+        return True
+    # Project directories are named after encoded absolute paths
+    return any(d.is_dir() and d.name.startswith('-') for d in path.iterdir())
+
+
+def resolve_roots(root_args: Optional[list] = None) -> list:
+    """
+    Resolve history roots from --root args, else the config file, else the
+    default projects directory. A root may be a projects directory, a
+    .claude directory, or a home directory or machine snapshot holding
+    .claude/projects.
+    """
+    raw_roots = root_args or load_config_roots()
+    if not raw_roots:
+        return [get_claude_projects_dir()]
+
+    roots = []
+    for raw in raw_roots:
+        base = Path(raw).expanduser().resolve()
+        if not base.is_dir():
+            print(f"Warning: history root not found: {raw}", file=sys.stderr)
+            continue
+
+        # A folder named projects only counts inside .claude; a home directory
+        # often has an unrelated code folder with that name
+        if (base / '.claude' / 'projects').is_dir():
+            root = base / '.claude' / 'projects'
+        elif base.name == '.claude' and (base / 'projects').is_dir():
+            root = base / 'projects'
+        elif is_projects_dir(base):
+            root = base
+        else:
+            print(f"Warning: no Claude projects directory in history root: {raw}", file=sys.stderr)
+            continue
+
+        if not any(d.is_dir() for d in root.iterdir()):
+            print(f"Warning: no project directories in history root: {raw}", file=sys.stderr)
+        if root not in roots:
+            roots.append(root)
+    return roots
+
+
 def decode_project_path(encoded: str) -> str:
     """Decode encoded project path."""
     if encoded.startswith('-'):
@@ -79,9 +164,12 @@ def encode_project_path(path: str) -> str:
     return '-' + path.replace('/', '-')
 
 
-def get_project_dirs(specific_project: Optional[str] = None) -> list:
+def get_project_dirs(
+    specific_project: Optional[str] = None,
+    projects_dir: Optional[Path] = None
+) -> list:
     """Get all project directories or a specific one."""
-    projects_dir = get_claude_projects_dir()
+    projects_dir = projects_dir or get_claude_projects_dir()
 
     if not projects_dir.exists():
         return []
@@ -201,11 +289,16 @@ def get_date_filter(args) -> Optional[tuple]:
 
 def conversation_in_date_range(conversation: Conversation, date_range: tuple) -> bool:
     """Check if conversation falls within date range."""
+    return timestamp_in_date_range(conversation.timestamp, date_range)
+
+
+def timestamp_in_date_range(timestamp: str, date_range: Optional[tuple]) -> bool:
+    """Check if a timestamp string falls within date range."""
     if not date_range:
         return True
 
     start, end = date_range
-    conv_date = parse_timestamp(conversation.timestamp)
+    conv_date = parse_timestamp(timestamp)
 
     if conv_date is None:
         return False
@@ -213,6 +306,141 @@ def conversation_in_date_range(conversation: Conversation, date_range: tuple) ->
     return start <= conv_date < end
 
 
+# Runs of word characters plus the punctuation that glues code tokens
+# together, so paths, dotted file names and snake/kebab case stay whole.
+TOKEN_PATTERN = re.compile(r'[\w./\\:-]+')
+
+# Sub-words of an identifier: acronyms, capitalized/lowercase words, digits.
+SUBWORD_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+# Non-ASCII tokens are split on punctuation only: case boundaries there
+# would need Unicode case classes, which the re module does not have.
+SEPARATOR_PATTERN = re.compile(r'[\W_]+')
+
+TRIM_CHARS = './\\:-_'
+
+STOP_WORDS = frozenset({
+    'a', 'about', 'after', 'all', 'also', 'am', 'an', 'and', 'any', 'are',
+    'as', 'at', 'be', 'been', 'before', 'being', 'but', 'by', 'can', 'could',
+    'did', 'do', 'does', 'doing', 'for', 'from', 'had', 'has', 'have',
+    'having', 'he', 'her', 'here', 'him', 'his', 'how', 'i', 'if', 'in',
+    'into', 'is', 'it', 'its', 'just', 'let', 'me', 'my', 'no', 'not', 'now',
+    'of', 'on', 'or', 'our', 'out', 'over', 'she', 'should', 'so', 'some',
+    'than', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they',
+    'this', 'those', 'to', 'too', 'up', 'us', 'very', 'was', 'we', 'were',
+    'what', 'when', 'where', 'which', 'while', 'who', 'why', 'will', 'with',
+    'would', 'you', 'your',
+})
+
+
+def split_code_tokens(tokens: list) -> list:
+    """Split camelCase, snake_case and path tokens, keeping the original."""
+    result = []
+    for token in tokens:
+        # Single characters are noise, whether whole tokens (the t of
+        # don't, the c of ?c=1) or sub-words
+        token = token.strip(TRIM_CHARS)
+        if len(token) < 2:
+            continue
+        result.append(token)
+        if token.isascii():
+            parts = SUBWORD_PATTERN.findall(token)
+        else:
+            parts = SEPARATOR_PATTERN.split(token)
+        parts = [part for part in parts if len(part) > 1]
+        if parts != [token]:
+            result.extend(parts)
+    return result
+
+
+def lowercase_tokens(tokens: list) -> list:
+    """Lowercase all tokens."""
+    return [token.lower() for token in tokens]
+
+
+def remove_stop_words(tokens: list) -> list:
+    """Drop common English words that carry no search signal."""
+    return [token for token in tokens if token not in STOP_WORDS]
+
+
+def light_stem(word: str) -> str:
+    """Strip plural, -ing and -ed inflections from an alphabetic word."""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    stem = word
+    if word.endswith(('ies', 'ied')):
+        stem = word[:-3] + 'y'
+    elif word.endswith('es') and not word.endswith(('aes', 'ees', 'oes')):
+        stem = word[:-1]
+    elif word.endswith('s') and not word.endswith(('is', 'ss', 'us')):
+        stem = word[:-1]
+    elif word.endswith('ing'):
+        stem = word[:-3]
+    elif word.endswith('ed') and not word.endswith('eed'):
+        stem = word[:-2]
+
+    if len(stem) < 3:
+        # Short verbs lose their 'e' to -ing/-ed (using, used): restore it
+        if len(stem) == 2 and any(c in 'aeiou' for c in stem) and word.endswith(('ing', 'ed')):
+            return stem + 'e'
+        return word
+
+    # Undouble final consonants (running -> run) and drop a trailing 'e'
+    # so that cache/caches/cached/caching all meet at the same stem.
+    if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in 'aeiouylsz':
+        stem = stem[:-1]
+    if len(stem) > 3 and stem.endswith('e'):
+        stem = stem[:-1]
+    return stem
+
+
+def stem_tokens(tokens: list) -> list:
+    """Apply light stemming to every token."""
+    return [light_stem(token) for token in tokens]
+
+
+class TermDictionary:
+    """Interns analyzed terms as dense integer IDs."""
+
+    def __init__(self, ids: Optional[dict] = None):
+        self.ids = ids if ids is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, term: str) -> int:
+        """Return the ID for a term, assigning a new one if unseen."""
+        return self.ids.setdefault(term, len(self.ids))
+
+
+@dataclass
+class Analyzer:
+    """
+    Text analysis pipeline: a tokenizer followed by token filters.
+    `name` keys the on-disk index, so change it when the pipeline changes.
+    """
+    name: str = 'code-v2'
+    tokenizer: Callable = TOKEN_PATTERN.findall
+    filters: tuple = (split_code_tokens, lowercase_tokens, remove_stop_words, stem_tokens)
+
+    def analyze(self, text: str) -> list:
+        """Run text through the tokenizer and every filter in order."""
+        tokens = self.tokenizer(text)
+        for token_filter in self.filters:
+            tokens = token_filter(tokens)
+        return tokens
+
+    def terms(self, text: str) -> frozenset:
+        """Analyze text into a set of distinct terms."""
+        if not text:
+            return frozenset()
+        return frozenset(self.analyze(text))
+
+
+DEFAULT_ANALYZER = Analyzer()
+
+
 def parse_conversation_file(file_path: Path) -> Optional[Conversation]:
     """Parse a JSONL conversation file into a Conversation object."""
     messages = []
@@ -280,48 +508,6 @@ def parse_conversation_file(file_path: Path) -> Optional[Conversation]:
     )
 
 
-def tokenize(text: str) -> set:
-    """Tokenize text into lowercase words."""
-    return set(re.findall(r'\b\w+\b', text.lower()))
-
-
-def calculate_relevance_score(query: str, conversation: Conversation) -> tuple:
-    """Calculate relevance score for a conversation."""
-    query_tokens = tokenize(query)
-    if not query_tokens:
-        return 0.0, []
-
-    total_score = 0.0
-    matched_messages = []
-
-    # Check summary (high weight)
-    if conversation.summary:
-        summary_tokens = tokenize(conversation.summary)
-        summary_overlap = len(query_tokens & summary_tokens) / len(query_tokens)
-        total_score += summary_overlap * 3.0
-
-    # Check messages
-    for msg in conversation.messages:
-        msg_tokens = tokenize(msg.content)
-        overlap = len(query_tokens & msg_tokens)
-
-        if overlap > 0:
-            msg_score = overlap / len(query_tokens)
-
-            # Boost user messages (problem descriptions)
-            if msg.role == 'user':
-                msg_score *= 1.5
-
-            # Boost messages with tool uses (solutions)
-            if msg.tool_uses:
-                msg_score *= 1.3
-
-            total_score += msg_score
-            matched_messages.append(msg)
-
-    return total_score, matched_messages
-
-
 def extract_bash_commands(conversation: Conversation) -> list:
     """Extract Bash commands run during the conversation."""
     commands = []
@@ -416,67 +602,1142 @@ def extract_topics(conversation: Conversation) -> list:
     return list(topics)[:5]
 
 
-def search_conversations(
-    query: str,
-    project_path: Optional[str] = None,
-    limit: int = 10,
-    date_filter: Optional[tuple] = None
-) -> list:
-    """Search conversations for the given query."""
-    results = []
-    project_dirs = get_project_dirs(project_path)
+@dataclass
+class Shard:
+    """One history root, ingested independently of the others."""
+    root: Path
+    conversations: list
+
+
+@dataclass
+class CollectionStats:
+    """Message count and per-term document frequencies, summable across shards."""
+    message_count: int
+    doc_freqs: Counter
+
+
+class ShardPool:
+    """
+    Runs per-root work in parallel, one worker process per root.
+
+    A root always goes to the same worker, so the indexes it opens stay
+    loaded in that process across the phases of a query. Work functions
+    are top-level functions called as fn(root, *per_root_args); only
+    their arguments and results cross process boundaries. A single root
+    runs in-process.
+    """
+
+    def __init__(self, roots: list):
+        self.roots = roots
+        self.executors = []
+        if len(roots) > 1:
+            self.executors = [ProcessPoolExecutor(max_workers=1) for _ in roots]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for executor in self.executors:
+            executor.shutdown()
+
+    def map(self, fn: Callable, *per_root_args) -> list:
+        """Call fn(root, *args) for every root, taking args from per-root sequences."""
+        calls = list(zip(self.roots, *per_root_args))
+        if not self.executors:
+            return [fn(*call) for call in calls]
+        futures = [executor.submit(fn, *call) for executor, call in zip(self.executors, calls)]
+        return [future.result() for future in futures]
+
+
+def get_cache_dir(root: Path) -> Path:
+    """Get the on-disk cache directory for a history root."""
+    digest = hashlib.sha1(str(root).encode('utf-8')).hexdigest()[:16]
+    return Path.home() / '.claude' / 'cache' / 'conversation-search' / digest
+
+
+def load_cache_file(path: Path, version: tuple) -> Optional[dict]:
+    """Load a pickled cache file; None if missing, unreadable or outdated."""
+    try:
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Rebuilding unreadable cache {path}: {e}", file=sys.stderr)
+        return None
+
+    if not isinstance(data, dict) or data.get('version') != version:
+        return None
+    return data
 
+
+def save_cache_file(path: Path, data: dict):
+    """Atomically replace a pickled cache file, warning if it can't be written."""
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write cache {path}: {e}", file=sys.stderr)
+
+
+def iter_session_files(project_dirs: list):
+    """Yield the session JSONL files in the given project dirs."""
     for project_dir in project_dirs:
         for jsonl_file in project_dir.glob('*.jsonl'):
             # Skip agent files
-            if jsonl_file.name.startswith('agent-'):
+            if not jsonl_file.name.startswith('agent-'):
+                yield jsonl_file
+
+
+# Facet name -> what one counted occurrence is
+FACETS = {
+    'project': 'messages',
+    'branch': 'messages',
+    'tool': 'calls',
+    'command': 'runs',
+    'file': 'touches',
+}
+
+# Shell punctuation; runs of these lex as one token (&&, ;\n, >&, ...)
+SHELL_PUNCTUATION = '();<>|&\n'
+
+# A punctuation token containing any of these starts a new command
+SHELL_SEPARATOR_CHARS = frozenset(';|(\n')
+
+# Keywords after which the next word is still a command
+SHELL_KEYWORDS = frozenset({
+    'if', 'then', 'else', 'elif', 'do', 'while', 'until', '!', '{', '}', 'fi', 'done', 'esac',
+})
+
+# Keywords whose following words are not commands until the next separator
+SHELL_LIST_KEYWORDS = frozenset({'for', 'case', 'select'})
+
+# A [[ ... ]] test is a condition, not a command, and may contain && and ||
+SHELL_TEST_OPEN = '[['
+SHELL_TEST_CLOSE = ']]'
+
+# Words that wrap the real executable, with their options that take an argument
+COMMAND_WRAPPERS = {
+    'sudo': frozenset({'-u', '-g', '-h', '-p', '-C', '-D', '-r', '-t', '-U', '-T'}),
+    'env': frozenset({'-u', '-C', '-S'}),
+    'time': frozenset({'-f', '-o'}),
+    'nohup': frozenset(),
+    'exec': frozenset({'-a'}),
+    'command': frozenset(),
+}
+
+ENV_ASSIGNMENT_PATTERN = re.compile(r'^\w+=')
+
+# Heredoc operator (not a <<< here-string) and its delimiter word
+HEREDOC_PATTERN = re.compile(r'(?<!<)<<(?!<)-?\s*([\'"]?)([\w.-]+)\1')
+
+SPARK_CHARS = ' \u2581\u2582\u2583\u2584\u2585\u2586\u2587\u2588'
+
+
+def strip_heredoc_bodies(command: str) -> str:
+    """Drop heredoc bodies, up to and including their delimiter lines."""
+    lines = []
+    pending = []
+    for line in command.split('\n'):
+        if pending:
+            if line.strip() == pending[0]:
+                pending.pop(0)
+            continue
+        lines.append(line)
+        pending.extend(match.group(2) for match in HEREDOC_PATTERN.finditer(line))
+    return '\n'.join(lines)
+
+
+def lex_shell_words(command: str) -> list:
+    """Lex a shell command into words and punctuation, keeping newlines as tokens."""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=SHELL_PUNCTUATION)
+    lexer.whitespace = ' \t\r'
+    lexer.whitespace_split = True
+    # Comments are handled by the caller; shlex would swallow their newline
+    lexer.commenters = ''
+    try:
+        return list(lexer)
+    except ValueError:
+        # Unbalanced quotes - fall back to splitting on whitespace and operators
+        return [
+            word for word in re.split(r'[ \t\r]+|(&&|\|\||[;|&()\n])', command)
+            if word
+        ]
+
+
+def extract_executables(command: str) -> list:
+    """Extract the executable name of every command in a Bash tool command."""
+    command = strip_heredoc_bodies(command.replace('\\\n', ' '))
+
+    executables = []
+    expect_command = True
+    in_comment = False
+    in_test = False
+    wrapper_options = None
+    skip_next = False
+    # Case arms: patterns run up to ')' and start again after ';;'
+    case_pending = False
+    case_depth = 0
+    in_case_patterns = False
+
+    for word in lex_shell_words(command):
+        if in_test:
+            if word == SHELL_TEST_CLOSE:
+                in_test = False
+                expect_command = False
+            continue
+
+        if all(c in SHELL_PUNCTUATION for c in word):
+            if '\n' in word:
+                in_comment = False
+            if in_case_patterns:
+                if ')' in word:
+                    in_case_patterns = False
+                    expect_command = True
                 continue
+            if case_depth and (';;' in word or ';&' in word):
+                in_case_patterns = True
+                expect_command = False
+                continue
+            if SHELL_SEPARATOR_CHARS & set(word) or word in ('&', '&&'):
+                expect_command = True
+                wrapper_options = None
+                skip_next = False
+            elif expect_command:
+                # Redirection before the command: skip its target
+                skip_next = True
+            continue
+
+        if in_comment:
+            continue
+        if in_case_patterns:
+            if word == 'esac':
+                case_depth -= 1
+                in_case_patterns = False
+            continue
+        if case_pending and word == 'in':
+            case_pending = False
+            case_depth += 1
+            in_case_patterns = True
+            continue
+        if not expect_command:
+            continue
+        if word.startswith('#'):
+            in_comment = True
+            continue
+        if skip_next:
+            skip_next = False
+            continue
+
+        if wrapper_options is not None and word.startswith('-'):
+            skip_next = word in wrapper_options
+            continue
+        if word == SHELL_TEST_OPEN:
+            in_test = True
+            continue
+        if word == 'esac' and case_depth:
+            # Last arm without a closing ';;'
+            case_depth -= 1
+        if ENV_ASSIGNMENT_PATTERN.match(word) or word in SHELL_KEYWORDS:
+            continue
+        if word in SHELL_LIST_KEYWORDS:
+            expect_command = False
+            case_pending = word == 'case'
+            continue
+        if word in COMMAND_WRAPPERS:
+            wrapper_options = COMMAND_WRAPPERS[word]
+            continue
+
+        executables.append(Path(word).name or word)
+        expect_command = False
+        wrapper_options = None
+    return executables
+
+
+def extract_facet_values(conversation: Conversation, msg: Message):
+    """Yield (facet, value) pairs contributed by a single message."""
+    yield 'project', conversation.project_path
+    if conversation.git_branch:
+        yield 'branch', conversation.git_branch
+
+    for tool in msg.tool_uses:
+        name = tool.get('name') or ''
+        inp = tool.get('input') or {}
+        if not name:
+            continue
+        yield 'tool', name
+
+        if name == 'Bash':
+            for executable in extract_executables(inp.get('command', '')):
+                yield 'command', executable
+        elif name in ('Read', 'Write', 'Edit', 'NotebookEdit'):
+            path = inp.get('file_path') or inp.get('notebook_path')
+            if path:
+                yield 'file', path
+
+
+class FacetColumn:
+    """
+    Columnar storage for one facet.
+    Each row is a (value, day, session, count) aggregate held in parallel
+    typed arrays, so range aggregations are a single pass over ints.
+    """
+
+    def __init__(self, values: Optional[dict] = None, value_ids: Optional[array] = None,
+                 days: Optional[array] = None, sessions: Optional[array] = None,
+                 counts: Optional[array] = None):
+        self.values = TermDictionary(values)
+        self.value_ids = value_ids if value_ids is not None else array('I')
+        self.days = days if days is not None else array('I')
+        self.sessions = sessions if sessions is not None else array('I')
+        self.counts = counts if counts is not None else array('I')
+
+    def state(self) -> dict:
+        """Picklable state, the inverse of FacetColumn(**state)."""
+        return {
+            'values': self.values.ids,
+            'value_ids': self.value_ids,
+            'days': self.days,
+            'sessions': self.sessions,
+            'counts': self.counts,
+        }
+
+    def append(self, value: str, day: int, session: int, count: int):
+        """Append one aggregated row."""
+        self.value_ids.append(self.values.intern(value))
+        self.days.append(day)
+        self.sessions.append(session)
+        self.counts.append(count)
+
+    def remove_sessions(self, removed: set):
+        """Drop every row belonging to the given sessions."""
+        keep = [i for i, session in enumerate(self.sessions) if session not in removed]
+        self.value_ids = array('I', (self.value_ids[i] for i in keep))
+        self.days = array('I', (self.days[i] for i in keep))
+        self.sessions = array('I', (self.sessions[i] for i in keep))
+        self.counts = array('I', (self.counts[i] for i in keep))
+
+    def totals(self, day_range: Optional[tuple] = None, sessions: Optional[set] = None,
+               value_filter: Optional[str] = None) -> dict:
+        """Sum counts per value within [start_day, end_day) over the given sessions."""
+        start_day, end_day = day_range or (0, 2 ** 32)
+        names = list(self.values.ids)
+
+        # Flat list indexed by value ID
+        totals = [0] * len(names)
+        if sessions is None:
+            for value_id, day, count in zip(self.value_ids, self.days, self.counts):
+                if start_day <= day < end_day:
+                    totals[value_id] += count
+        else:
+            for value_id, day, session, count in zip(self.value_ids, self.days, self.sessions, self.counts):
+                if start_day <= day < end_day and session in sessions:
+                    totals[value_id] += count
+
+        needle = value_filter.lower() if value_filter else None
+        return {
+            names[value_id]: count
+            for value_id, count in enumerate(totals)
+            if count and (needle is None or needle in names[value_id].lower())
+        }
 
-            conversation = parse_conversation_file(jsonl_file)
-            if conversation is None:
+    def details(self, values: set, day_range: Optional[tuple] = None,
+                sessions: Optional[set] = None) -> dict:
+        """
+        Per-day histograms for the given values.
+        Returns {value: {'sessions': n, 'histogram': {day: [count, sessions]}}}.
+        """
+        start_day, end_day = day_range or (0, 2 ** 32)
+        wanted = {self.values.ids[v]: v for v in values if v in self.values.ids}
+
+        value_sessions = defaultdict(set)
+        histograms = defaultdict(dict)
+        for value_id, day, session, count in zip(self.value_ids, self.days, self.sessions, self.counts):
+            if value_id not in wanted or not start_day <= day < end_day:
+                continue
+            if sessions is not None and session not in sessions:
                 continue
+            value_sessions[value_id].add(session)
+            # Rows are unique per (value, day, session)
+            bucket = histograms[value_id].setdefault(day, [0, 0])
+            bucket[0] += count
+            bucket[1] += 1
+
+        return {
+            wanted[value_id]: {
+                'sessions': len(value_sessions[value_id]),
+                'histogram': histograms[value_id],
+            }
+            for value_id in histograms
+        }
+
+
+FACET_INDEX_VERSION = 1
 
-            # Apply date filter
-            if not conversation_in_date_range(conversation, date_filter):
+
+class FacetIndex:
+    """
+    Facet counters for one history root, persisted next to its term index.
+
+    Every facet is maintained regardless of which ones a run asks for.
+    Files are keyed by path with their mtime and size; a new or changed
+    file gets a fresh session number, and the rows of its previous version
+    are removed. A file entry is (mtime_ns, size, session, session_id, msg_count).
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.path = get_cache_dir(root) / 'facets.pickle'
+        self.version = (FACET_INDEX_VERSION, str(root))
+        self.dirty = False
+
+        data = load_cache_file(self.path, self.version) or {}
+        columns = data.get('columns', {})
+        self.columns = {name: FacetColumn(**columns.get(name, {})) for name in FACETS}
+        self.files = data.get('files', {})
+        self.next_session = data.get('next_session', 0)
+
+    def save(self):
+        """Write the index back to disk if it changed."""
+        if not self.dirty:
+            return
+        save_cache_file(self.path, {
+            'version': self.version,
+            'columns': {name: column.state() for name, column in self.columns.items()},
+            'files': self.files,
+            'next_session': self.next_session,
+        })
+        self.dirty = False
+
+    def refresh(self, project_dirs: list):
+        """Fold in new or changed files under the given project dirs, and drop deleted ones."""
+        scanned_dirs = {str(d) for d in project_dirs}
+        seen = set()
+        removed = set()
+
+        for jsonl_file in iter_session_files(project_dirs):
+            path = str(jsonl_file)
+            seen.add(path)
+            try:
+                stat = jsonl_file.stat()
+            except OSError:
                 continue
 
-            score, matched = calculate_relevance_score(query, conversation)
-            if score > 0:
-                results.append(SearchResult(
-                    conversation=conversation,
-                    score=score,
-                    matched_messages=matched,
-                    problem_excerpt=extract_problem_excerpt(conversation),
-                    solution_excerpt=extract_solution_excerpt(matched),
-                    commands_run=extract_bash_commands(conversation)
-                ))
+            entry = self.files.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                continue
+            if entry:
+                removed.add(entry[2])
+            self.add_file(jsonl_file, stat)
+
+        for path in list(self.files):
+            if path not in seen and str(Path(path).parent) in scanned_dirs:
+                removed.add(self.files.pop(path)[2])
+                self.dirty = True
+
+        if removed:
+            for column in self.columns.values():
+                column.remove_sessions(removed)
+
+        self.save()
+
+    def add_file(self, file_path: Path, stat):
+        """Parse one file and append its facet rows."""
+        session = self.next_session
+        self.next_session += 1
+        self.dirty = True
+
+        conversation = parse_conversation_file(file_path)
+        if conversation is None:
+            self.files[str(file_path)] = (stat.st_mtime_ns, stat.st_size, session, file_path.stem, 0)
+            return
+        self.files[str(file_path)] = (
+            stat.st_mtime_ns, stat.st_size, session,
+            conversation.session_id, len(conversation.messages)
+        )
+
+        pending = {name: Counter() for name in self.columns}
+        for msg in conversation.messages:
+            msg_date = parse_timestamp(msg.timestamp)
+            if msg_date is None:
+                continue
+            day = msg_date.toordinal()
+            for name, value in extract_facet_values(conversation, msg):
+                pending[name][(value, day)] += 1
+
+        for name, counter in pending.items():
+            column = self.columns[name]
+            for (value, day), count in counter.items():
+                column.append(value, day, session, count)
+
+    def catalog(self, project_dirs: list) -> list:
+        """(session_id, msg_count, path) of non-empty files in the project dirs."""
+        scanned_dirs = {str(d) for d in project_dirs}
+        return [
+            (entry[3], entry[4], path)
+            for path, entry in self.files.items()
+            if entry[4] and str(Path(path).parent) in scanned_dirs
+        ]
+
+    def sessions_for(self, paths: set) -> Optional[set]:
+        """Session numbers of the given files; None when that is every file."""
+        if len(paths) == len(self.files):
+            return None
+        return {self.files[path][2] for path in paths}
+
+
+def parse_facets_arg(facets_arg: str) -> list:
+    """Parse a comma-separated facet list, rejecting unknown names."""
+    facets = [f.strip() for f in facets_arg.split(',') if f.strip()]
+    unknown = [f for f in facets if f not in FACETS]
+    if unknown or not facets:
+        print(f"Unknown facet(s): {', '.join(unknown) or facets_arg}. "
+              f"Choose from: {', '.join(FACETS)}", file=sys.stderr)
+        sys.exit(1)
+    return list(dict.fromkeys(facets))
 
-    results.sort(key=lambda r: r.score, reverse=True)
-    return results[:limit]
+
+# Facet indexes opened by this process, keyed by root
+_OPEN_FACET_INDEXES = {}
+
+
+def open_facet_index(root: Path) -> FacetIndex:
+    """Load a root's facet index once per process."""
+    index = _OPEN_FACET_INDEXES.get(root)
+    if index is None:
+        index = _OPEN_FACET_INDEXES[root] = FacetIndex(root)
+    return index
+
+
+def facet_catalog(root: Path, project_path: Optional[str]) -> list:
+    """Refresh a root's facet index and list its sessions."""
+    index = open_facet_index(root)
+    project_dirs = get_project_dirs(project_path, root)
+    index.refresh(project_dirs)
+    return index.catalog(project_dirs)
+
+
+def facet_totals(root: Path, paths: set, facets: list, day_range: Optional[tuple],
+                 value_filter: Optional[str]) -> dict:
+    """Per-facet value totals of a root."""
+    index = open_facet_index(root)
+    sessions = index.sessions_for(paths)
+    return {name: index.columns[name].totals(day_range, sessions, value_filter) for name in facets}
+
+
+def facet_details(root: Path, paths: set, values: dict, day_range: Optional[tuple]) -> dict:
+    """Per-facet histograms of a root for the chosen values."""
+    index = open_facet_index(root)
+    sessions = index.sessions_for(paths)
+    return {
+        name: index.columns[name].details(facet_values, day_range, sessions)
+        for name, facet_values in values.items()
+    }
+
+
+def aggregate_facets(
+    facets: list,
+    project_path: Optional[str] = None,
+    day_range: Optional[tuple] = None,
+    value_filter: Optional[str] = None,
+    limit: int = 10,
+    roots: Optional[list] = None
+) -> dict:
+    """
+    Aggregate facets over every root from their persisted counters.
+    Messages are filtered by day, not per session. Returns, per facet, the
+    total, the number of distinct values and the top values with per-day
+    histograms.
+    """
+    if roots is None:
+        roots = [get_claude_projects_dir()]
+    if not roots:
+        return {name: {'total': 0, 'distinct': 0, 'values': []} for name in facets}
+
+    with ShardPool(roots) as pool:
+        catalogs = pool.map(partial(facet_catalog, project_path=project_path))
+        shard_paths = choose_session_copies(catalogs)
+
+        totals = {name: Counter() for name in facets}
+        for shard_totals in pool.map(
+            partial(facet_totals, facets=facets, day_range=day_range, value_filter=value_filter),
+            shard_paths
+        ):
+            for name, values in shard_totals.items():
+                totals[name].update(values)
+
+        top = {
+            name: sorted(totals[name], key=lambda value: (-totals[name][value], value))[:limit]
+            for name in facets
+        }
+        top_values = {name: set(values) for name, values in top.items()}
+        shard_details = pool.map(
+            partial(facet_details, values=top_values, day_range=day_range),
+            shard_paths
+        )
+
+    aggregates = {}
+    for name in facets:
+        values = []
+        for value in top[name]:
+            sessions = 0
+            histogram = defaultdict(lambda: [0, 0])
+            for details in shard_details:
+                detail = details[name].get(value)
+                if detail is None:
+                    continue
+                sessions += detail['sessions']
+                for day, (count, day_sessions) in detail['histogram'].items():
+                    histogram[day][0] += count
+                    histogram[day][1] += day_sessions
+            values.append({
+                'value': value,
+                'count': totals[name][value],
+                'sessions': sessions,
+                'histogram': [
+                    {
+                        'date': datetime.fromordinal(day).strftime('%Y-%m-%d'),
+                        'count': histogram[day][0],
+                        'sessions': histogram[day][1],
+                    }
+                    for day in sorted(histogram)
+                ],
+            })
+        aggregates[name] = {
+            'total': sum(totals[name].values()),
+            'distinct': len(totals[name]),
+            'values': values,
+        }
+    return aggregates
+
+
+def format_sparkline(histogram: list, start_day: int, end_day: int, width: int = 60) -> str:
+    """Render a per-day histogram as a sparkline of at most `width` buckets."""
+    span = max(end_day - start_day, 1)
+    bucket_count = min(span, width)
+    buckets = [0] * bucket_count
+    for entry in histogram:
+        day = datetime.strptime(entry['date'], '%Y-%m-%d').toordinal()
+        bucket = (day - start_day) * bucket_count // span
+        if 0 <= bucket < bucket_count:
+            buckets[bucket] += entry['count']
+
+    peak = max(buckets) or 1
+    top = len(SPARK_CHARS) - 1
+    return ''.join(
+        SPARK_CHARS[-(-count * top // peak)] if count else SPARK_CHARS[0]
+        for count in buckets
+    )
+
+
+def format_facets(aggregates: dict, day_range: Optional[tuple], date_desc: str) -> str:
+    """Format facet aggregates as text with per-value sparklines."""
+    lines = [f"## Facets{date_desc}", ""]
+
+    if day_range:
+        start_day, end_day = day_range
+    else:
+        days = [
+            datetime.strptime(entry['date'], '%Y-%m-%d').toordinal()
+            for facet in aggregates.values()
+            for value in facet['values']
+            for entry in value['histogram']
+        ]
+        start_day, end_day = (min(days), max(days) + 1) if days else (0, 1)
+
+    for name, facet in aggregates.items():
+        unit = FACETS[name]
+        lines.append(f"### {name} - {facet['total']} {unit} across {facet['distinct']} values")
+        if not facet['values']:
+            lines.append("   (none)")
+        width = max((len(v['value']) for v in facet['values']), default=0)
+        width = min(width, 50)
+        for value in facet['values']:
+            label = value['value']
+            if len(label) > width:
+                label = '...' + label[-(width - 3):]
+            spark = format_sparkline(value['histogram'], start_day, end_day)
+            lines.append(
+                f"   {label:<{width}}  {value['count']:>6}  "
+                f"({value['sessions']} session{'s' if value['sessions'] != 1 else ''})  {spark}"
+            )
+        lines.append("")
+
+    return '\n'.join(lines)
+
+
+INDEX_VERSION = 1
+
+# Fold the delta segment into the main one once it reaches this size
+DELTA_MERGE_MIN = 5000
+DELTA_MERGE_RATIO = 0.1
+
+# Per-message flags kept in the index for scoring boosts
+MESSAGE_USER = 1
+MESSAGE_TOOLS = 2
+
+
+class TermIndex:
+    """
+    Persistent inverted index of analyzed message terms for one history root.
+
+    Each root has its own term dictionary. Postings (message IDs per term)
+    live in a compact main segment - per-term offsets into one array - plus
+    a small delta segment for files indexed since the last merge. Files are
+    keyed by path with their mtime and size, and only new or changed files
+    are parsed and analyzed. Messages of a superseded file version stay in
+    the postings until the next merge but no longer belong to a live file.
+
+    A file entry is a tuple:
+        (mtime_ns, size, session_id, timestamp, first_msg, msg_count, summary_terms)
+    where first_msg is -1 for files parsed but not analyzed yet because
+    they fell outside the requested date range. first_msg also identifies
+    the file version in the per-message msg_file column.
+    """
+
+    def __init__(self, root: Path, analyzer: Analyzer = DEFAULT_ANALYZER):
+        self.root = root
+        self.analyzer = analyzer
+        self.path = get_cache_dir(root) / f'terms-{analyzer.name}.pickle'
+        self.version = (INDEX_VERSION, analyzer.name, str(root))
+        self.dirty = False
+
+        data = load_cache_file(self.path, self.version) or {}
+        self.dictionary = TermDictionary(data.get('terms'))
+        self.files = data.get('files', {})
+        self.msg_file = data.get('msg_file', array('I'))
+        self.msg_flags = data.get('msg_flags', array('B'))
+        self.main_offsets = data.get('main_offsets', array('Q', [0]))
+        self.main_postings = data.get('main_postings', array('I'))
+        self.delta = data.get('delta', {})
+        self.delta_start = data.get('delta_start', 0)
+
+    def save(self):
+        """Write the index back to disk if it changed."""
+        if not self.dirty:
+            return
+        save_cache_file(self.path, {
+            'version': self.version,
+            'terms': self.dictionary.ids,
+            'files': self.files,
+            'msg_file': self.msg_file,
+            'msg_flags': self.msg_flags,
+            'main_offsets': self.main_offsets,
+            'main_postings': self.main_postings,
+            'delta': self.delta,
+            'delta_start': self.delta_start,
+        })
+        self.dirty = False
+
+    def refresh(self, project_dirs: list, date_filter: Optional[tuple] = None):
+        """
+        Bring the index up to date for the given project dirs.
+        Unchanged files are only stat()ed; files outside the date filter
+        are parsed for their timestamp but not analyzed.
+        """
+        scanned_dirs = {str(d) for d in project_dirs}
+        seen = set()
+
+        for jsonl_file in iter_session_files(project_dirs):
+            path = str(jsonl_file)
+            seen.add(path)
+            try:
+                stat = jsonl_file.stat()
+            except OSError:
+                continue
+
+            entry = self.files.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                indexed, empty = entry[4] >= 0, entry[5] == 0
+                if indexed or empty or not timestamp_in_date_range(entry[3], date_filter):
+                    continue
+
+            self.add_file(jsonl_file, stat, date_filter)
+
+        # Forget files deleted from the scanned dirs
+        for path in list(self.files):
+            if path not in seen and str(Path(path).parent) in scanned_dirs:
+                del self.files[path]
+                self.dirty = True
+
+        live_messages = sum(entry[5] for entry in self.files.values() if entry[4] >= 0)
+        delta_messages = len(self.msg_file) - self.delta_start
+        if (delta_messages >= max(DELTA_MERGE_MIN, DELTA_MERGE_RATIO * self.delta_start)
+                or len(self.msg_file) > 2 * live_messages + DELTA_MERGE_MIN):
+            self.merge()
+
+        self.save()
+
+    def add_file(self, file_path: Path, stat, date_filter: Optional[tuple] = None):
+        """Parse one file and, if it is within the date filter, analyze it."""
+        path = str(file_path)
+        self.dirty = True
+        conversation = parse_conversation_file(file_path)
+        if conversation is None:
+            # Remember empty or unreadable files until they change
+            self.files[path] = (stat.st_mtime_ns, stat.st_size, file_path.stem, '', -1, 0, ())
+            return
+
+        if not conversation_in_date_range(conversation, date_filter):
+            self.files[path] = (
+                stat.st_mtime_ns, stat.st_size, conversation.session_id,
+                conversation.timestamp, -1, len(conversation.messages), ()
+            )
+            return
+
+        intern = self.dictionary.intern
+        delta = self.delta
+        first_msg = len(self.msg_file)
+        for msg_id, msg in enumerate(conversation.messages, first_msg):
+            self.msg_file.append(first_msg)
+            self.msg_flags.append(
+                (MESSAGE_USER if msg.role == 'user' else 0)
+                | (MESSAGE_TOOLS if msg.tool_uses else 0)
+            )
+            for term in self.analyzer.terms(msg.content):
+                term_id = intern(term)
+                postings = delta.get(term_id)
+                if postings is None:
+                    postings = delta[term_id] = array('I')
+                postings.append(msg_id)
+
+        summary_terms = tuple(sorted(
+            intern(term) for term in self.analyzer.terms(conversation.summary)
+        ))
+        self.files[path] = (
+            stat.st_mtime_ns, stat.st_size, conversation.session_id,
+            conversation.timestamp, first_msg, len(conversation.messages), summary_terms
+        )
+
+    def merge(self):
+        """Fold the delta into the main segment, dropping superseded messages."""
+        live_files = {entry[4] for entry in self.files.values() if entry[4] >= 0}
+
+        # Renumber live messages densely; a file's first message comes first
+        remap = array('q', [-1]) * len(self.msg_file)
+        msg_file = array('I')
+        msg_flags = array('B')
+        for msg_id, (file_no, flags) in enumerate(zip(self.msg_file, self.msg_flags)):
+            if file_no in live_files:
+                remap[msg_id] = len(msg_file)
+                msg_file.append(remap[file_no])
+                msg_flags.append(flags)
+
+        offsets = array('Q', [0])
+        postings = array('I')
+        for term_id in range(len(self.dictionary)):
+            for msg_id in self.postings(term_id):
+                new_id = remap[msg_id]
+                if new_id >= 0:
+                    postings.append(new_id)
+            offsets.append(len(postings))
+
+        self.files = {
+            path: entry if entry[4] < 0 else entry[:4] + (remap[entry[4]],) + entry[5:]
+            for path, entry in self.files.items()
+        }
+        self.msg_file = msg_file
+        self.msg_flags = msg_flags
+        self.main_offsets = offsets
+        self.main_postings = postings
+        self.delta = {}
+        self.delta_start = len(msg_file)
+        self.dirty = True
+
+    def postings(self, term_id: int):
+        """Message IDs containing a term, main segment first."""
+        if term_id + 1 < len(self.main_offsets):
+            yield from self.main_postings[self.main_offsets[term_id]:self.main_offsets[term_id + 1]]
+        yield from self.delta.get(term_id, ())
+
+    def catalog(self, project_dirs: list, date_filter: Optional[tuple] = None) -> list:
+        """(session_id, msg_count, path) of indexed files matching the filters."""
+        scanned_dirs = {str(d) for d in project_dirs}
+        return [
+            (entry[2], entry[5], path)
+            for path, entry in self.files.items()
+            if entry[4] >= 0
+            and str(Path(path).parent) in scanned_dirs
+            and timestamp_in_date_range(entry[3], date_filter)
+        ]
+
+    def statistics(self, query_terms: frozenset, paths: set) -> CollectionStats:
+        """Count messages and query-term document frequencies over the given files."""
+        file_nos = {self.files[path][4] for path in paths}
+        message_count = sum(self.files[path][5] for path in paths)
+        doc_freqs = Counter()
+        for term in query_terms:
+            term_id = self.dictionary.ids.get(term)
+            if term_id is not None:
+                doc_freqs[term] = sum(
+                    1 for msg_id in self.postings(term_id) if self.msg_file[msg_id] in file_nos
+                )
+        return CollectionStats(message_count=message_count, doc_freqs=doc_freqs)
+
+    def score(self, term_weights: dict, paths: set, limit: int) -> list:
+        """
+        Score the given files and return the top (score, path, matched
+        message offsets). Each message scores the weight of its matched
+        terms over the query weight, boosted for user messages and tool
+        use; a summary match counts triple.
+        """
+        query_weight = sum(term_weights.values())
+        if query_weight <= 0:
+            return []
+
+        paths_by_file = {self.files[path][4]: path for path in paths}
+        query_ids = {}
+        for term in term_weights:
+            term_id = self.dictionary.ids.get(term)
+            if term_id is not None:
+                query_ids[term_id] = term
+
+        msg_weights = defaultdict(float)
+        for term_id, term in query_ids.items():
+            weight = term_weights[term]
+            for msg_id in self.postings(term_id):
+                if self.msg_file[msg_id] in paths_by_file:
+                    msg_weights[msg_id] += weight
+
+        scores = defaultdict(float)
+        matched = defaultdict(list)
+        for msg_id in sorted(msg_weights):
+            msg_score = msg_weights[msg_id] / query_weight
+
+            # Boost user messages (problem descriptions)
+            if self.msg_flags[msg_id] & MESSAGE_USER:
+                msg_score *= 1.5
+
+            # Boost messages with tool uses (solutions)
+            if self.msg_flags[msg_id] & MESSAGE_TOOLS:
+                msg_score *= 1.3
+
+            file_no = self.msg_file[msg_id]
+            scores[file_no] += msg_score
+            matched[file_no].append(msg_id - file_no)
+
+        # Check summaries (high weight)
+        for file_no, path in paths_by_file.items():
+            summary_weight = sum(
+                term_weights[query_ids[term_id]]
+                for term_id in self.files[path][6] if term_id in query_ids
+            )
+            if summary_weight:
+                scores[file_no] += summary_weight / query_weight * 3.0
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, paths_by_file[file_no], matched[file_no]) for file_no, score in top]
+
+
+def load_shard(
+    root: Path,
+    project_path: Optional[str] = None,
+    date_filter: Optional[tuple] = None
+) -> Shard:
+    """Parse every conversation under one history root."""
+    conversations = []
+    for jsonl_file in iter_session_files(get_project_dirs(project_path, root)):
+        conversation = parse_conversation_file(jsonl_file)
+        if conversation is None:
+            continue
+
+        # Apply date filter
+        if not conversation_in_date_range(conversation, date_filter):
+            continue
+
+        conversations.append(conversation)
+    return Shard(root=root, conversations=conversations)
+
+
+def choose_session_copies(catalogs: list) -> list:
+    """
+    Pick one copy of each session id across shards.
+    Each catalog lists (session_id, msg_count, key) for one shard; returns
+    the set of winning keys per shard. The most complete copy (most
+    messages) wins; ties go to the earlier root.
+    """
+    best = {}
+    for shard_index, catalog in enumerate(catalogs):
+        for session_id, msg_count, key in catalog:
+            current = best.get(session_id)
+            if current is None or msg_count > current[1]:
+                best[session_id] = (shard_index, msg_count, key)
+
+    winners = [set() for _ in catalogs]
+    for shard_index, _, key in best.values():
+        winners[shard_index].add(key)
+    return winners
+
+
+def dedupe_sessions(shards: list) -> list:
+    """Keep one copy of each session id across shards."""
+    winners = choose_session_copies([
+        [(c.session_id, len(c.messages), c.file_path) for c in shard.conversations]
+        for shard in shards
+    ])
+    return [
+        Shard(
+            root=shard.root,
+            conversations=[c for c in shard.conversations if c.file_path in keep]
+        )
+        for shard, keep in zip(shards, winners)
+    ]
+
+
+def load_shards(
+    roots: Optional[list] = None,
+    project_path: Optional[str] = None,
+    date_filter: Optional[tuple] = None
+) -> list:
+    """Load every root as a shard in parallel, deduplicating sessions."""
+    if roots is None:
+        roots = [get_claude_projects_dir()]
+    if not roots:
+        return []
+
+    with ShardPool(roots) as pool:
+        shards = pool.map(partial(load_shard, project_path=project_path, date_filter=date_filter))
+    return dedupe_sessions(shards)
+
+
+def merge_statistics(stats: list) -> CollectionStats:
+    """Sum shard statistics into collection-wide statistics."""
+    merged = CollectionStats(message_count=0, doc_freqs=Counter())
+    for shard_stats in stats:
+        merged.message_count += shard_stats.message_count
+        merged.doc_freqs.update(shard_stats.doc_freqs)
+    return merged
+
+
+def compute_term_weights(query_terms: frozenset, stats: CollectionStats) -> dict:
+    """BM25-style IDF of each query term over the whole collection."""
+    n = stats.message_count
+    return {
+        term: math.log(1 + (n - stats.doc_freqs[term] + 0.5) / (stats.doc_freqs[term] + 0.5))
+        for term in query_terms
+    }
+
+
+# Term indexes opened by this process, keyed by (root, analyzer name)
+_OPEN_TERM_INDEXES = {}
+
+
+def open_term_index(root: Path, analyzer: Analyzer = DEFAULT_ANALYZER) -> TermIndex:
+    """Load a root's term index once per process."""
+    key = (root, analyzer.name)
+    index = _OPEN_TERM_INDEXES.get(key)
+    if index is None:
+        index = _OPEN_TERM_INDEXES[key] = TermIndex(root, analyzer)
+    return index
+
+
+def shard_catalog(
+    root: Path,
+    project_path: Optional[str],
+    date_filter: Optional[tuple],
+    analyzer: Analyzer = DEFAULT_ANALYZER
+) -> list:
+    """Refresh a root's index and list its sessions matching the filters."""
+    index = open_term_index(root, analyzer)
+    project_dirs = get_project_dirs(project_path, root)
+    index.refresh(project_dirs, date_filter)
+    return index.catalog(project_dirs, date_filter)
+
+
+def shard_statistics(
+    root: Path,
+    paths: set,
+    query_terms: frozenset,
+    analyzer: Analyzer = DEFAULT_ANALYZER
+) -> CollectionStats:
+    """Collection statistics of a root for the query terms."""
+    return open_term_index(root, analyzer).statistics(query_terms, paths)
+
+
+def search_shard(
+    root: Path,
+    paths: set,
+    term_weights: dict,
+    limit: int,
+    analyzer: Analyzer = DEFAULT_ANALYZER
+) -> list:
+    """Score a root's sessions and return its local top results."""
+    results = []
+    for score, path, offsets in open_term_index(root, analyzer).score(term_weights, paths, limit):
+        # Only the top sessions are re-read, for excerpts
+        conversation = parse_conversation_file(Path(path))
+        if conversation is None:
+            continue
+        matched = [conversation.messages[i] for i in offsets if i < len(conversation.messages)]
+        results.append(SearchResult(
+            conversation=conversation,
+            score=score,
+            matched_messages=matched,
+            problem_excerpt=extract_problem_excerpt(conversation),
+            solution_excerpt=extract_solution_excerpt(matched),
+            commands_run=extract_bash_commands(conversation)
+        ))
+    return results
+
+
+def search_conversations(
+    query: str,
+    project_path: Optional[str] = None,
+    limit: int = 10,
+    date_filter: Optional[tuple] = None,
+    analyzer: Analyzer = DEFAULT_ANALYZER,
+    roots: Optional[list] = None
+) -> list:
+    """
+    Search conversations for the given query across one or more roots.
+    Each root keeps its own on-disk term index and term dictionary and is
+    queried in its own worker process; only the query string is analyzed
+    here, and terms travel as strings. Scores use collection-wide IDF so
+    the per-root top results merge into a consistent ranking.
+    """
+    query_terms = analyzer.terms(query)
+    if roots is None:
+        roots = [get_claude_projects_dir()]
+    if not query_terms or not roots:
+        return []
+
+    with ShardPool(roots) as pool:
+        catalogs = pool.map(partial(
+            shard_catalog, project_path=project_path, date_filter=date_filter, analyzer=analyzer
+        ))
+        shard_paths = choose_session_copies(catalogs)
+
+        stats = merge_statistics(pool.map(
+            partial(shard_statistics, query_terms=query_terms, analyzer=analyzer), shard_paths
+        ))
+        term_weights = compute_term_weights(query_terms, stats)
+
+        shard_results = pool.map(
+            partial(search_shard, term_weights=term_weights, limit=limit, analyzer=analyzer),
+            shard_paths
+        )
+
+    return heapq.nlargest(
+        limit,
+        (result for results in shard_results for result in results),
+        key=lambda r: r.score
+    )
 
 
 def get_conversations_for_date(
     target_date: datetime,
-    project_path: Optional[str] = None
+    project_path: Optional[str] = None,
+    roots: Optional[list] = None
 ) -> list:
     """Get all conversations for a specific date."""
-    conversations = []
-    project_dirs = get_project_dirs(project_path)
-
     start = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
     end = start + timedelta(days=1)
 
-    for project_dir in project_dirs:
-        for jsonl_file in project_dir.glob('*.jsonl'):
-            if jsonl_file.name.startswith('agent-'):
-                continue
-
-            conversation = parse_conversation_file(jsonl_file)
-            if conversation is None:
-                continue
-
-            if conversation_in_date_range(conversation, (start, end)):
-                conversations.append(conversation)
+    shards = load_shards(roots, project_path, (start, end))
+    conversations = [c for shard in shards for c in shard.conversations]
 
     # Sort by timestamp
     conversations.sort(key=lambda c: c.timestamp)
@@ -605,10 +1866,18 @@ Examples:
     search_history.py --digest today
     search_history.py --digest yesterday --project ~/Projects/myapp
     search_history.py --digest 2026-01-04
+
+    # Facet counts and daily histograms
+    search_history.py --facets project,branch,tool,command --days 30
+    search_history.py --facets file "routes.ts" --days 14
+
+    # Several history roots (e.g. transcripts synced from other machines)
+    search_history.py "EMFILE error" --root ~/.claude --root /mnt/shared/devbox-2
         """
     )
 
-    parser.add_argument('query', nargs='?', help='Search query (optional with --digest)')
+    parser.add_argument('query', nargs='?',
+                       help='Search query (optional with --digest; value filter with --facets)')
     parser.add_argument('--project', '-p', help='Specific project path to search')
     parser.add_argument('--limit', '-l', type=int, default=5, help='Max results (default: 5)')
     parser.add_argument('--format', '-f', choices=['text', 'json'], default='text',
@@ -624,12 +1893,22 @@ Examples:
     parser.add_argument('--digest', nargs='?', const='today', metavar='DATE',
                        help='Show daily digest (today, yesterday, or YYYY-MM-DD)')
 
+    # Facets mode
+    parser.add_argument('--facets', metavar='LIST',
+                       help=f"Count and histogram facets ({','.join(FACETS)})")
+
+    # History roots
+    parser.add_argument('--root', action='append', metavar='PATH',
+                       help='History root to search; repeat for several '
+                            '(default: config "roots", else ~/.claude/projects)')
+
     args = parser.parse_args()
+    roots = resolve_roots(args.root)
 
     # Handle digest mode
     if args.digest is not None:
         target_date = parse_digest_date(args.digest)
-        conversations = get_conversations_for_date(target_date, args.project)
+        conversations = get_conversations_for_date(target_date, args.project, roots)
 
         if args.format == 'json':
             output = {
@@ -654,6 +1933,40 @@ Examples:
 
         sys.exit(0)
 
+    # Handle facets mode
+    if args.facets is not None:
+        facets = parse_facets_arg(args.facets)
+        date_filter = get_date_filter(args)
+        day_range = None
+        if date_filter:
+            day_range = (date_filter[0].toordinal(), date_filter[1].toordinal())
+
+        aggregates = aggregate_facets(facets, args.project, day_range, args.query, args.limit, roots)
+
+        if args.format == 'json':
+            output = {
+                'since': date_filter[0].strftime('%Y-%m-%d') if date_filter else None,
+                'until': date_filter[1].strftime('%Y-%m-%d') if date_filter else None,
+                'filter': args.query,
+                'facets': aggregates
+            }
+            print(json.dumps(output, indent=2))
+        else:
+            date_desc = ""
+            if args.today:
+                date_desc = " (today only)"
+            elif args.yesterday:
+                date_desc = " (yesterday only)"
+            elif args.days:
+                date_desc = f" (last {args.days} days)"
+            elif args.since:
+                date_desc = f" (since {args.since})"
+            if args.query:
+                date_desc += f" matching '{args.query}'"
+            print(format_facets(aggregates, day_range, date_desc))
+
+        sys.exit(0)
+
     # Regular search mode - require query
     if not args.query:
         parser.error("query is required (unless using --digest)")
@@ -665,7 +1978,8 @@ Examples:
         query=args.query,
         project_path=args.project,
         limit=args.limit,
-        date_filter=date_filter
+        date_filter=date_filter,
+        roots=roots
     )
 
     if not results:
@@ -0,0 +1,328 @@
+"""Tests for the conversation-search script."""
+
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'skills' / 'scripts'))
+
+import search_history  # noqa: E402
+from search_history import DEFAULT_ANALYZER  # noqa: E402
+
+
+def test_analyzer_splits_code_tokens_and_keeps_original():
+    terms = DEFAULT_ANALYZER.analyze('useNuxtContent /src/api/routes.ts ERR_MODULE_NOT_FOUND')
+    assert terms[:4] == ['usenuxtcontent', 'use', 'nuxt', 'content']
+    assert 'src/api/routes.ts' in terms
+    assert 'rout' in terms and 'api' in terms
+    assert 'err_module_not_found' in terms and 'found' in terms
+    # 'not' is a stop word
+    assert 'not' not in terms
+
+
+def test_analyzer_does_not_split_non_ascii_words_into_letters():
+    assert DEFAULT_ANALYZER.analyze('błąd') == ['błąd']
+    assert DEFAULT_ANALYZER.analyze('zażółć gęślą') == ['zażółć', 'gęślą']
+    assert DEFAULT_ANALYZER.analyze('ścieżka/pliku.py') == [
+        'ścieżka/pliku.py', 'ścieżka', 'pliku', 'py'
+    ]
+
+
+def test_analyzer_drops_single_character_parts():
+    assert DEFAULT_ANALYZER.analyze('v2Api') == ['v2api', 'api']
+    assert DEFAULT_ANALYZER.analyze("don't") == ['don']
+    assert 'c' not in DEFAULT_ANALYZER.analyze('https://x.com/a-b?c=1')
+    assert '1' not in DEFAULT_ANALYZER.analyze('https://x.com/a-b?c=1')
+
+
+def test_light_stem_conflates_inflections():
+    for family in (
+        ('use', 'uses', 'used', 'using'),
+        ('cache', 'caches', 'cached', 'caching'),
+        ('fix', 'fixes', 'fixed', 'fixing'),
+        ('run', 'runs', 'running'),
+        ('query', 'queries'),
+    ):
+        assert len({search_history.light_stem(word) for word in family}) == 1, family
+
+
+def test_light_stem_leaves_short_and_non_inflected_words():
+    for word in ('bring', 'thing', 'class', 'status', 'shed', 'ts'):
+        assert search_history.light_stem(word) == word
+
+
+def write_session(project_dir: Path, session_id: str, texts: list, day: str = '2026-10-19'):
+    """Write a session file alternating user and assistant messages."""
+    project_dir.mkdir(parents=True, exist_ok=True)
+    rows = [
+        {
+            'type': 'user' if i % 2 == 0 else 'assistant',
+            'uuid': str(i),
+            'timestamp': f'{day}T10:{i:02d}:00.000Z',
+            'message': {'content': text},
+        }
+        for i, text in enumerate(texts)
+    ]
+    path = project_dir / f'{session_id}.jsonl'
+    path.write_text('\n'.join(json.dumps(row) for row in rows) + '\n', encoding='utf-8')
+    return path
+
+
+def search_ids(query: str, **kwargs) -> list:
+    return [r.conversation.session_id for r in search_history.search_conversations(query, **kwargs)]
+
+
+def test_term_index_only_reanalyzes_changed_files(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    root = tmp_path / 'projects'
+    write_session(root / '-app', 'one', ['vitest browser mode', 'done'])
+    changed = write_session(root / '-app', 'two', ['nuxt content', 'done'])
+
+    parsed = []
+    parse = search_history.parse_conversation_file
+    monkeypatch.setattr(search_history, 'parse_conversation_file',
+                        lambda path: parsed.append(path.stem) or parse(path))
+
+    index = search_history.TermIndex(root)
+    index.refresh(search_history.get_project_dirs(None, root))
+    assert sorted(parsed) == ['one', 'two']
+
+    # A fresh process loads the index from disk and parses nothing
+    parsed.clear()
+    index = search_history.TermIndex(root)
+    index.refresh(search_history.get_project_dirs(None, root))
+    assert parsed == []
+
+    write_session(root / '-app', 'two', ['nuxt content', 'vitest cache fixed'])
+    os.utime(changed, ns=(0, 0))
+    index.refresh(search_history.get_project_dirs(None, root))
+    assert parsed == ['two']
+
+
+def test_date_filter_skips_analysis_until_needed(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    root = tmp_path / 'projects'
+    write_session(root / '-app', 'old', ['vitest'], day='2025-01-01')
+    write_session(root / '-app', 'new', ['vitest'], day='2026-10-19')
+
+    date_filter = (datetime(2026, 10, 1), datetime(2026, 11, 1))
+    assert search_ids('vitest', roots=[root], date_filter=date_filter) == ['new']
+    index = search_history.TermIndex(root)
+    assert index.files[str(root / '-app' / 'old.jsonl')][4] == -1
+
+    assert sorted(search_ids('vitest', roots=[root])) == ['new', 'old']
+
+
+def test_term_index_merge_preserves_results(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    root = tmp_path / 'projects'
+    for i in range(5):
+        write_session(root / '-app', f's{i}', [f'useNuxtContent topic{i}', 'fixed the cache'])
+
+    def scores():
+        search_history._OPEN_TERM_INDEXES.clear()
+        return sorted(
+            ((r.conversation.session_id, round(r.score, 6))
+             for r in search_history.search_conversations('nuxt cache topic3', roots=[root])),
+            key=lambda item: (-item[1], item[0])
+        )
+
+    before = scores()
+    # Merge on every refresh, after replacing and deleting files
+    monkeypatch.setattr(search_history, 'DELTA_MERGE_MIN', 0)
+    write_session(root / '-app', 's1', ['useNuxtContent topic1', 'fixed the cache'])
+    write_session(root / '-app', 's9', ['unrelated'])
+    (root / '-app' / 's9.jsonl').unlink()
+    assert scores() == before
+    assert scores() == before
+    assert before[0][0] == 's3'
+
+
+def test_extract_executables_skips_heredoc_bodies():
+    command = 'git commit -m "$(cat <<\'EOF\'\nFix parser\n\nHandle x; rm -rf y | z\nEOF\n)"'
+    assert search_history.extract_executables(command) == ['git']
+    command = 'cat <<EOF > notes.txt\nline; ls\nEOF\nwc -l notes.txt'
+    assert search_history.extract_executables(command) == ['cat', 'wc']
+
+
+def test_extract_executables_joins_line_continuations():
+    command = 'docker run \\\n  -v /a:/b \\\n  --rm image'
+    assert search_history.extract_executables(command) == ['docker']
+
+
+def test_extract_executables_keeps_multiline_quotes_together():
+    assert search_history.extract_executables("python -c 'import x\nprint(1)'") == ['python']
+    assert search_history.extract_executables('echo "a | b"\nnpm test') == ['echo', 'npm']
+
+
+def test_extract_executables_skips_wrappers_and_their_options():
+    assert search_history.extract_executables('sudo -u bob make install') == ['make']
+    assert search_history.extract_executables('env -u HOME FOO=bar node app.js') == ['node']
+    assert search_history.extract_executables('time -f %e /usr/bin/pytest -q') == ['pytest']
+
+
+def test_extract_executables_splits_on_operators_and_newlines():
+    command = 'FOO=1 npm run build && git status | head -n 2; (cd x && ls) > out.txt 2>&1'
+    assert search_history.extract_executables(command) == ['npm', 'git', 'head', 'cd', 'ls']
+    assert search_history.extract_executables('cd repo # don\'t forget\nnpm i') == ['cd', 'npm']
+    assert search_history.extract_executables('if grep -q x f; then echo yes; fi') == ['grep', 'echo']
+    assert search_history.extract_executables('for f in *.py; do black "$f"; done') == ['black']
+    assert search_history.extract_executables('[[ -f x && -d y ]] && rm x') == ['rm']
+    assert search_history.extract_executables('npx tsc; case $x in a) foo;; esac') == ['npx', 'foo']
+    command = 'case "$1" in\n  (a|b) make ;;\n  c) ./run.sh x; ls\nesac; pwd'
+    assert search_history.extract_executables(command) == ['make', 'run.sh', 'ls', 'pwd']
+
+
+def write_tool_session(project_dir: Path, session_id: str, commands: list, day: str = '2026-10-19'):
+    """Write a session whose assistant messages each run one Bash command."""
+    project_dir.mkdir(parents=True, exist_ok=True)
+    rows = [{'type': 'user', 'uuid': 'u', 'timestamp': f'{day}T09:00:00.000Z', 'gitBranch': 'main',
+             'message': {'content': 'run things'}}]
+    for i, command in enumerate(commands):
+        rows.append({
+            'type': 'assistant', 'uuid': str(i), 'timestamp': f'{day}T10:{i:02d}:00.000Z',
+            'message': {'content': [{'type': 'tool_use', 'name': 'Bash', 'input': {'command': command}}]},
+        })
+    path = project_dir / f'{session_id}.jsonl'
+    path.write_text('\n'.join(json.dumps(row) for row in rows) + '\n', encoding='utf-8')
+    return path
+
+
+def command_counts(root: Path) -> dict:
+    aggregates = search_history.aggregate_facets(['command'], roots=[root])
+    return {v['value']: (v['count'], v['sessions']) for v in aggregates['command']['values']}
+
+
+def test_facet_index_folds_in_only_changed_sessions(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    root = tmp_path / 'projects'
+    write_tool_session(root / '-app', 'one', ['git status', 'npm test'])
+    changed = write_tool_session(root / '-app', 'two', ['git log'])
+    assert command_counts(root) == {'git': (2, 2), 'npm': (1, 1)}
+
+    parsed = []
+    parse = search_history.parse_conversation_file
+    monkeypatch.setattr(search_history, 'parse_conversation_file',
+                        lambda path: parsed.append(path.stem) or parse(path))
+
+    search_history._OPEN_FACET_INDEXES.clear()
+    write_tool_session(root / '-app', 'two', ['pytest -q', 'pytest -x'])
+    os.utime(changed, ns=(0, 0))
+    assert command_counts(root) == {'git': (1, 1), 'npm': (1, 1), 'pytest': (2, 1)}
+    assert parsed == ['two']
+
+    (root / '-app' / 'one.jsonl').unlink()
+    assert command_counts(root) == {'pytest': (2, 1)}
+
+
+def test_facet_histogram_counts_sessions_per_day(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    root = tmp_path / 'projects'
+    write_tool_session(root / '-app', 'a', ['make', 'make'], day='2026-10-18')
+    write_tool_session(root / '-app', 'b', ['make'], day='2026-10-19')
+    write_tool_session(root / '-app', 'c', ['make'], day='2026-10-19')
+
+    day_range = (datetime(2026, 10, 19).toordinal(), datetime(2026, 10, 20).toordinal())
+    make = search_history.aggregate_facets(['command'], day_range=day_range, roots=[root])['command']['values'][0]
+    assert (make['count'], make['sessions']) == (2, 2)
+    assert make['histogram'] == [{'date': '2026-10-19', 'count': 2, 'sessions': 2}]
+
+    make = search_history.aggregate_facets(['command'], roots=[root])['command']['values'][0]
+    assert [(h['date'], h['count'], h['sessions']) for h in make['histogram']] == [
+        ('2026-10-18', 2, 1), ('2026-10-19', 2, 2)
+    ]
+
+
+def test_resolve_roots_probes_claude_and_projects_dirs(tmp_path, capsys):
+    snapshot = tmp_path / 'devbox-2'
+    (snapshot / '.claude' / 'projects' / '-app').mkdir(parents=True)
+    (snapshot / 'projects' / 'mycode').mkdir(parents=True)
+    claude_dir = tmp_path / 'devbox-3' / '.claude'
+    (claude_dir / 'projects' / '-app').mkdir(parents=True)
+    copied = tmp_path / 'copied-projects'
+    (copied / '-app').mkdir(parents=True)
+    empty = tmp_path / 'devbox-4' / '.claude' / 'projects'
+    empty.mkdir(parents=True)
+    home = tmp_path / 'home'
+    (home / 'Documents').mkdir(parents=True)
+
+    roots = search_history.resolve_roots([
+        str(snapshot), str(claude_dir), str(copied), str(empty.parent.parent), str(home)
+    ])
+    assert roots == [snapshot / '.claude' / 'projects', claude_dir / 'projects', copied, empty]
+    err = capsys.readouterr().err
+    assert 'no project directories in history root' in err
+    assert f'no Claude projects directory in history root: {home}' in err
+
+
+def test_config_roots_must_be_strings(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    config = tmp_path / '.claude' / 'conversation-search.json'
+    config.parent.mkdir()
+
+    config.write_text(json.dumps({'roots': ['~/a', '/b']}))
+    assert search_history.load_config_roots() == ['~/a', '/b']
+
+    config.write_text(json.dumps({'roots': [1]}))
+    with pytest.raises(SystemExit):
+        search_history.load_config_roots()
+    assert "'roots' must be a list of paths" in capsys.readouterr().err
+
+
+def test_choose_session_copies_prefers_most_complete_then_earlier_root():
+    winners = search_history.choose_session_copies([
+        [('a', 3, 'r0/a'), ('b', 5, 'r0/b')],
+        [('a', 4, 'r1/a'), ('b', 5, 'r1/b'), ('c', 1, 'r1/c')],
+    ])
+    assert winners == [{'r0/b'}, {'r1/a', 'r1/c'}]
+
+
+def test_merge_statistics_sums_shards():
+    stats = search_history.merge_statistics([
+        search_history.CollectionStats(10, Counter({'nuxt': 2})),
+        search_history.CollectionStats(5, Counter({'nuxt': 1, 'cache': 4})),
+    ])
+    assert (stats.message_count, stats.doc_freqs) == (15, Counter({'nuxt': 3, 'cache': 4}))
+
+
+def test_federated_search_scores_like_a_single_root(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    texts = {
+        's0': ['vitest cache miss', 'fixed'],
+        's1': ['nuxt content cache', 'done'],
+        's2': ['vitest browser mode', 'ok'],
+        's3': ['unrelated', 'cache warmed'],
+    }
+    single = tmp_path / 'single'
+    for session_id, session_texts in texts.items():
+        write_session(single / '-app', session_id, session_texts)
+    # Split across two roots; s1 is synced to both
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    for session_id in ('s0', 's1'):
+        write_session(first / '-app', session_id, texts[session_id])
+    for session_id in ('s1', 's2', 's3'):
+        write_session(second / '-app', session_id, texts[session_id])
+
+    def scores(roots):
+        return sorted(
+            (r.conversation.session_id, round(r.score, 6))
+            for r in search_history.search_conversations('vitest cache', roots=roots)
+        )
+
+    assert scores([first, second]) == scores([single])
+
+
+def worker_pid(root):
+    return os.getpid()
+
+
+def test_shard_pool_runs_each_root_in_its_own_process(tmp_path):
+    with search_history.ShardPool([tmp_path / 'a', tmp_path / 'b']) as pool:
+        pids = pool.map(worker_pid)
+        assert pool.map(worker_pid) == pids
+    assert len(set(pids)) == 2 and os.getpid() not in pids